@@ -1,27 +1,42 @@
 import json
+from itertools import islice
 
+# Stream only the subtrees we actually read (filters.extras and the first
+# few units) instead of json.load-ing the whole multi-MB file.
 try:
-    with open('/home/clindbeck9/infinity-data/data/panoceania.json', 'r') as f:
-        data = json.load(f)
-        
+    import ijson
+except ImportError:
+    ijson = None
+
+PATH = 'data/panoceania.json'
+
+try:
+    if ijson is not None:
+        with open(PATH, 'rb') as f:
+            extras = list(ijson.items(f, 'filters.extras.item'))
+        with open(PATH, 'rb') as f:
+            units = list(islice(ijson.items(f, 'units.item'), 5))
+    else:
+        with open(PATH, 'r') as f:
+            data = json.load(f)
+        extras = data.get('filters', {}).get('extras', [])
+        units = data.get('units', [])[:5]
+
     # Find all extras with type DISTANCE
-    if 'filters' in data and 'extras' in data['filters']:
-        extras = data['filters']['extras']
-        
-        print("All DISTANCE type extras:")
-        distance_extras = [e for e in extras if e.get('type') == 'DISTANCE']
-        for e in distance_extras:
-            print(f"  ID {e['id']}: {e['name']}")
-            
-        print("\nNow let's look at how move is stored in profiles:")
-        # Find a unit with move as an array
-        for unit in data['units'][:5]:
-            for pg in unit.get('profileGroups', []):
-                for profile in pg.get('profiles', []):
-                    move = profile.get('move')
-                    print(f"Unit: {unit['name']}, Move: {move}")
-                    break
+    print("All DISTANCE type extras:")
+    distance_extras = [e for e in extras if e.get('type') == 'DISTANCE']
+    for e in distance_extras:
+        print(f"  ID {e['id']}: {e['name']}")
+
+    print("\nNow let's look at how move is stored in profiles:")
+    # Find a unit with move as an array
+    for unit in units:
+        for pg in unit.get('profileGroups', []):
+            for profile in pg.get('profiles', []):
+                move = profile.get('move')
+                print(f"Unit: {unit['name']}, Move: {move}")
                 break
-                    
+            break
+
 except Exception as e:
     print(f"Error: {e}")
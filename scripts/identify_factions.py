@@ -5,7 +5,7 @@ Analyzes JSON files in the data directory to identify which faction each file re
 """
 import json
 import os
-import glob
+from collections import Counter
 
 DATA_DIR = "./data"
 METADATA_FILE = os.path.join(DATA_DIR, "metadata.json")
@@ -31,15 +31,18 @@ def main():
     factions_map = {f['id']: f['name'] for f in metadata.get('factions', [])}
     
     # 2. Iterate through all .json files in data directory (excluding metadata.json)
-    json_files = glob.glob(os.path.join(DATA_DIR, "*.json"))
-    
+    # os.scandir skips the extra stat per entry that glob pays.
+    with os.scandir(DATA_DIR) as it:
+        json_files = [
+            e.path for e in it
+            if e.is_file() and e.name.endswith('.json') and e.name != "metadata.json"
+        ]
+
     print(f"{'Filename':<20} | {'Faction ID':<10} | {'Faction Name'}")
     print("-" * 60)
 
     for filepath in sorted(json_files):
         filename = os.path.basename(filepath)
-        if filename == "metadata.json":
-            continue
 
         data = load_json(filepath)
         if not data or 'units' not in data:
@@ -51,15 +54,13 @@ def main():
             continue
 
         # 3. Frequency Analysis
-        faction_counts = {}
         total_units = len(units)
-        
-        for unit in units:
-            for fid in unit.get('factions', []):
-                faction_counts[fid] = faction_counts.get(fid, 0) + 1
-        
-        # Sort by count descending
-        sorted_factions = sorted(faction_counts.items(), key=lambda item: item[1], reverse=True)
+        faction_counts = Counter(
+            fid for unit in units for fid in unit.get('factions', ())
+        )
+
+        # Sorted by count descending
+        sorted_factions = faction_counts.most_common()
         
         if not sorted_factions:
             print(f"{filename:<20} | {'EMPTY':<10} | No faction data found")
@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+"""
+Query Infinity Script
+Searches the faction data files for units that can take a given weapon,
+skill, or piece of equipment, matched by (partial, case-insensitive) name.
+
+Usage:
+    python scripts/query_infinity.py --weapon "missile launcher"
+    python scripts/query_infinity.py --skill "martial arts" --equip motorcycle
+"""
+import argparse
+import hashlib
+import json
+import os
+import pickle
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+# ijson lets us stream just the `units` array out of each faction file
+# instead of materializing the whole document (filters, resume, fireteams,
+# etc. are never read). Prefer the C backend when it is installed.
+try:
+    import ijson.backends.yajl2_c as ijson
+except ImportError:
+    try:
+        import ijson
+    except ImportError:
+        ijson = None
+
+# orjson parses the same documents several times faster than stdlib json
+# and returns identical dicts/lists. It only offers loads() over bytes,
+# so callers read files in binary mode.
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+DATA_DIR = "./data"
+METADATA_FILE = os.path.join(DATA_DIR, "metadata.json")
+CACHE_FILE = ".units.pkl"
+
+
+class Unit:
+    """A single army unit with precomputed weapon/skill/equipment access."""
+
+    # With thousands of instances, skipping the per-instance __dict__
+    # roughly halves Unit overhead and makes attribute access fixed-offset.
+    __slots__ = ('isc', 'name', 'factions', 'profile_groups',
+                 'all_weapon_ids', 'all_skill_ids', 'all_equipment_ids')
+
+    def __init__(self, data):
+        self.isc = data.get('isc', '')
+        self.name = data.get('name', '')
+        self.factions = data.get('factions', [])
+        self.profile_groups = data.get('profileGroups', [])
+        self.all_weapon_ids = set()
+        self.all_skill_ids = set()
+        self.all_equipment_ids = set()
+
+    def compute_access(self):
+        """Collect every weapon/skill/equipment id reachable through any
+        profile or option of this unit.
+
+        Profiles and options carry the same item lists, so both are drained
+        through one walk; set.update with a generator keeps the per-item
+        work in C instead of one set.add bytecode per element.
+        """
+        weapons, skills, equipment = set(), set(), set()
+        for pg in self.profile_groups:
+            for bucket in (pg.get('profiles', ()), pg.get('options', ())):
+                for item in bucket:
+                    weapons.update(w['id'] for w in item.get('weapons', ()) if 'id' in w)
+                    skills.update(s['id'] for s in item.get('skills', ()) if 'id' in s)
+                    equipment.update(e['id'] for e in item.get('equip', ()) if 'id' in e)
+        # The sets never change after this point; frozenset drops the
+        # growth headroom a mutable set keeps and makes that explicit.
+        self.all_weapon_ids = frozenset(weapons)
+        self.all_skill_ids = frozenset(skills)
+        self.all_equipment_ids = frozenset(equipment)
+        # Nothing downstream reads the raw profile tree once the id sets
+        # exist; releasing it frees the bulk of each Unit's footprint
+        # (and keeps it out of the on-disk cache).
+        self.profile_groups = None
+
+    def has_weapon(self, weapon_id):
+        return weapon_id in self.all_weapon_ids
+
+    def has_skill(self, skill_id):
+        return skill_id in self.all_skill_ids
+
+    def has_equipment(self, equipment_id):
+        return equipment_id in self.all_equipment_ids
+
+
+def _list_json_files(data_dir):
+    """Sorted paths of every .json directly under data_dir.
+
+    os.scandir avoids the extra stat per entry that glob pays.
+    """
+    with os.scandir(data_dir) as it:
+        return sorted(e.path for e in it if e.is_file() and e.name.endswith('.json'))
+
+
+def _iter_units(filepath):
+    """Yield unit dicts from a faction file one at a time.
+
+    With ijson installed, only the `units` array is ever parsed into
+    Python objects; everything else in the file is skipped by the
+    incremental parser. Falls back to json.load otherwise.
+    """
+    if ijson is not None:
+        try:
+            with open(filepath, 'rb') as f:
+                yield from ijson.items(f, 'units.item')
+        except Exception as e:
+            print(f"Error loading {filepath}: {e}")
+    else:
+        try:
+            with open(filepath, 'rb') as f:
+                data = _loads(f.read())
+        except Exception as e:
+            print(f"Error loading {filepath}: {e}")
+            return
+        # Non-faction files (e.g. classifieds.json) hold a bare list.
+        if isinstance(data, dict):
+            yield from data.get('units', [])
+
+
+@lru_cache(maxsize=None)
+def _compile_reason_collector(shape):
+    """Compile a match-reason collector specialized for one query shape.
+
+    shape is (weapons?, skills?, equipment?); kinds that are not part of
+    the query are compiled out entirely, so the per-unit code carries no
+    dead branches. Only 8 shapes exist, so every compiled variant is kept.
+    """
+    lines = ["def _collect(unit, targets, labels):", "    reasons = []"]
+    for i, attr in enumerate(('all_weapon_ids', 'all_skill_ids', 'all_equipment_ids')):
+        if shape[i]:
+            lines.append(
+                f"    reasons.extend(labels[{i}][x] for x in targets[{i}] & unit.{attr})"
+            )
+    lines.append("    return reasons")
+    namespace = {}
+    exec("\n".join(lines), namespace)
+    return namespace['_collect']
+
+
+def _load_faction_units(filepath):
+    """Pool worker: parse one faction file into units with access computed."""
+    units = []
+    for unit_data in _iter_units(filepath):
+        unit = Unit(unit_data)
+        unit.compute_access()
+        units.append(unit)
+    return units
+
+
+class Database:
+    """Loads metadata and every faction file, then answers name queries."""
+
+    def __init__(self, data_dir=DATA_DIR):
+        self.data_dir = data_dir
+        self.factions = {}
+        self.weapons = {}
+        self.skills = {}
+        self.equipment = {}
+        self._norm_maps = {}
+        self.units = []
+        # Inverted indexes: item id -> list of units with access to it.
+        self.by_weapon = {}
+        self.by_skill = {}
+        self.by_equipment = {}
+
+        # Parsing every faction file and recomputing unit access is pure
+        # repeated work across CLI invocations, so the loaded state is
+        # pickled next to the data and reused until any *.json changes.
+        cache_path = os.path.join(self.data_dir, CACHE_FILE)
+        stamp = self._data_stamp()
+        if not self._load_cache(cache_path, stamp):
+            self.load_metadata()
+            self.load_units()
+            self._save_cache(cache_path, stamp)
+
+        # Memoized per instance, so repeat queries become one dict lookup
+        # and the cache dies with the Database instead of pinning it
+        # through a class-level decorator.
+        self._search_ids = lru_cache(maxsize=256)(self.search_id_by_name)
+
+    def _data_stamp(self):
+        """Fingerprint of (path, mtime, size) for every data file."""
+        h = hashlib.sha1()
+        for path in _list_json_files(self.data_dir):
+            st = os.stat(path)
+            h.update(f"{path}:{st.st_mtime_ns}:{st.st_size}".encode())
+        return h.hexdigest()
+
+    def _load_cache(self, cache_path, stamp):
+        try:
+            with open(cache_path, 'rb') as f:
+                cached = pickle.load(f)
+        except Exception:
+            # Unpickling corrupt bytes can raise nearly anything
+            # (ValueError, TypeError, UnicodeDecodeError, ...); any
+            # unreadable cache just means a rebuild.
+            return False
+        if not isinstance(cached, dict) or cached.get('stamp') != stamp:
+            return False
+
+        try:
+            self.factions = cached['factions']
+            self.weapons = cached['weapons']
+            self.skills = cached['skills']
+            self.equipment = cached['equipment']
+            self._norm_maps = cached['norm_maps']
+            self.units = cached['units']
+            self.by_weapon = cached['by_weapon']
+            self.by_skill = cached['by_skill']
+            self.by_equipment = cached['by_equipment']
+        except KeyError:
+            # Cache written by an older schema of this script.
+            return False
+        return True
+
+    def _save_cache(self, cache_path, stamp):
+        state = {
+            'stamp': stamp,
+            'factions': self.factions,
+            'weapons': self.weapons,
+            'skills': self.skills,
+            'equipment': self.equipment,
+            'norm_maps': self._norm_maps,
+            'units': self.units,
+            'by_weapon': self.by_weapon,
+            'by_skill': self.by_skill,
+            'by_equipment': self.by_equipment,
+        }
+        try:
+            with open(cache_path, 'wb') as f:
+                pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        except OSError as e:
+            print(f"Warning: could not write cache {cache_path}: {e}")
+
+    def load_json(self, filepath):
+        """Load and parse a JSON file."""
+        try:
+            with open(filepath, 'rb') as f:
+                return _loads(f.read())
+        except Exception as e:
+            print(f"Error loading {filepath}: {e}")
+            return None
+
+    def load_metadata(self):
+        # metadata.json is small; a plain json.load is fine here.
+        metadata = self.load_json(os.path.join(self.data_dir, "metadata.json"))
+        if not metadata:
+            raise RuntimeError("Failed to load metadata")
+
+        self.factions = {f['id']: f['name'] for f in metadata.get('factions', [])}
+        self.weapons = {w['id']: w['name'] for w in metadata.get('weapons', [])}
+        self.skills = {s['id']: s['name'] for s in metadata.get('skills', [])}
+        self.equipment = {e['id']: e['name'] for e in metadata.get('equips', [])}
+
+        # Parallel tables of pre-normalized names, so queries don't
+        # re-lowercase every name string on each lookup.
+        self._norm_maps = {
+            'weapon': {i: n.lower() for i, n in self.weapons.items()},
+            'skill': {i: n.lower() for i, n in self.skills.items()},
+            'equipment': {i: n.lower() for i, n in self.equipment.items()},
+        }
+
+    def load_units(self):
+        by_weapon = defaultdict(list)
+        by_skill = defaultdict(list)
+        by_equipment = defaultdict(list)
+
+        faction_files = [
+            fp for fp in _list_json_files(self.data_dir)
+            if os.path.basename(fp) != "metadata.json"
+        ]
+
+        # Each faction file is independent and parsing is CPU-bound, so the
+        # parse + compute_access work fans out across a process pool; the
+        # main process only concatenates and indexes the returned units.
+        # Buckets hold row indices into self.units rather than object
+        # pointers: the index is a plain int column per item id, which
+        # pickles compactly and keeps candidate dedup on ints.
+        with ProcessPoolExecutor() as executor:
+            for units in executor.map(_load_faction_units, faction_files):
+                for unit in units:
+                    row = len(self.units)
+                    self.units.append(unit)
+                    for wid in unit.all_weapon_ids:
+                        by_weapon[wid].append(row)
+                    for sid in unit.all_skill_ids:
+                        by_skill[sid].append(row)
+                    for eid in unit.all_equipment_ids:
+                        by_equipment[eid].append(row)
+
+        self.by_weapon = dict(by_weapon)
+        self.by_skill = dict(by_skill)
+        self.by_equipment = dict(by_equipment)
+
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def normalize_name(name):
+        return name.lower()
+
+    def search_id_by_name(self, kind, item_name):
+        """Return the ids of every `kind` entry whose name contains item_name.
+
+        Returns a tuple so results are hashable for the per-instance
+        lru_cache wrapper (`self._search_ids`).
+        """
+        query = self.normalize_name(item_name)
+        return tuple(i for i, n in self._norm_maps[kind].items() if query in n)
+
+    def search_units(self, weapon=None, skill=None, equipment=None):
+        """Return (unit, match_reasons) pairs for units matching any query term."""
+        target_weapon_ids = self._search_ids('weapon', weapon) if weapon else ()
+        target_skill_ids = self._search_ids('skill', skill) if skill else ()
+        target_equipment_ids = self._search_ids('equipment', equipment) if equipment else ()
+
+        # The inverted indexes take us straight to the matching units, so the
+        # cost scales with the number of matches rather than units x ids.
+        candidates = {}  # unit row -> None, in insertion order
+        for wid in target_weapon_ids:
+            for row in self.by_weapon.get(wid, ()):
+                candidates[row] = None
+        for sid in target_skill_ids:
+            for row in self.by_skill.get(sid, ()):
+                candidates[row] = None
+        for eid in target_equipment_ids:
+            for row in self.by_equipment.get(eid, ()):
+                candidates[row] = None
+
+        target_weapons = set(target_weapon_ids)
+        target_skills = set(target_skill_ids)
+        target_equipment = set(target_equipment_ids)
+
+        # Reason strings are formatted once per target id, not once per
+        # (unit, id) hit.
+        labels = (
+            {wid: f"Weapon: {self.weapons[wid]}" for wid in target_weapons},
+            {sid: f"Skill: {self.skills[sid]}" for sid in target_skills},
+            {eid: f"Equipment: {self.equipment[eid]}" for eid in target_equipment},
+        )
+        targets = (target_weapons, target_skills, target_equipment)
+
+        # The collector is compiled per query shape (weapon-only,
+        # weapon+skill, ...), so the candidate loop runs no per-unit
+        # branching for kinds that were not queried.
+        collect = _compile_reason_collector(
+            (bool(target_weapons), bool(target_skills), bool(target_equipment))
+        )
+
+        # Keyed by isc, so dedup and insertion-ordered collection are one
+        # hash op instead of a parallel seen-set plus results list.
+        results = {}
+        for row in candidates:
+            unit = self.units[row]
+            if unit.isc in results:
+                continue
+
+            results[unit.isc] = (unit, collect(unit, targets, labels))
+        return list(results.values())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Search units by weapon/skill/equipment name.")
+    parser.add_argument('--weapon', help="Weapon name (partial match)")
+    parser.add_argument('--skill', help="Skill name (partial match)")
+    parser.add_argument('--equip', help="Equipment name (partial match)")
+    args = parser.parse_args()
+
+    if not (args.weapon or args.skill or args.equip):
+        parser.error("Provide at least one of --weapon, --skill, --equip")
+
+    db = Database()
+    results = db.search_units(weapon=args.weapon, skill=args.skill, equipment=args.equip)
+
+    print(f"{'Unit':<40} | {'Factions':<30} | Matches")
+    print("-" * 100)
+    for unit, reasons in results:
+        faction_names = ', '.join(db.factions.get(fid, str(fid)) for fid in unit.factions[:3])
+        print(f"{unit.name:<40} | {faction_names:<30} | {', '.join(reasons)}")
+    print(f"\n{len(results)} units matched.")
+
+
+if __name__ == "__main__":
+    main()